@@ -9,13 +9,23 @@ This script orchestrates the execution of the entire fraud detection ETL pipelin
 3. Train the fraud detection model
 4. Make predictions and load results to Oracle
 5. Display model performance metrics
+6. Create the Power BI dashboard data source
+7. Generate the Power BI report template
+
+Steps are scheduled as a dependency graph, so steps that do not depend on
+each other run in parallel. Compute-heavy steps run in worker processes;
+the I/O-bound reporting steps (5-7), which all read the step 4 predictions,
+run in a thread pool. The dashboard steps (6-7) run side by side, and the
+metrics report (5) runs after them so its output is not interleaved with
+theirs.
 
 Usage:
-    python app.py [--step STEP] [--show-metrics]
+    python app.py [--step STEP] [--show-metrics] [--accel {cpu,gpu}]
 
 Options:
-    --step STEP           Run a specific step (1-5) or 'all' for the entire pipeline (default: 'all')
+    --step STEP           Run a specific step (1-7) or 'all' for the entire pipeline (default: 'all')
     --show-metrics        Display model performance metrics after pipeline execution
+    --accel {cpu,gpu}     Device used to train the model (default: 'cpu')
 """
 
 import os
@@ -23,9 +33,13 @@ import sys
 import argparse
 import logging
 import importlib.util
+import shutil
+import tempfile
 import time
-import subprocess
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
+from graphlib import TopologicalSorter
 
 # Setup logging
 logging.basicConfig(
@@ -42,100 +56,154 @@ logger = logging.getLogger(__name__)
 # Base directory
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ETL_DIR = os.path.join(BASE_DIR, 'fraud_txn_workspace', 'etl')  # Updated path to correct ETL directory
+DASHBOARD_DIR = os.path.join(BASE_DIR, 'fraud_txn_workspace', 'dashboard')
+METRICS_SCRIPT = os.path.join(BASE_DIR, 'show_metrics.py')
+
+# Make the shared ETL helper modules (e.g. _db) importable by the step scripts
+sys.path.insert(0, ETL_DIR)
+
+# Maximum number of pipeline steps running at the same time, per executor
+MAX_WORKERS = int(os.getenv('PIPELINE_MAX_WORKERS', 4))
+MAX_IO_WORKERS = 4
+
+# A pipeline step: its number, description, script, the steps it depends on
+# and whether it is I/O-bound (run in a thread rather than a worker process)
+Step = namedtuple('Step', ['num', 'name', 'script_path', 'deps', 'io_bound'], defaults=[False])
+
+PIPELINE_STEPS = {
+    'step1': Step(1, "Load Bank Transactions to MySQL", os.path.join(ETL_DIR, "1_load_to_mysql.py"), []),
+    'step2': Step(2, "Transform Bank Features", os.path.join(ETL_DIR, "transform_bank_features.py"), ['step1']),
+    'step3': Step(3, "Train Fraud Detection Model", os.path.join(ETL_DIR, "3_train_model.py"), ['step2']),
+    'step4': Step(4, "Make Predictions and Load to Oracle", os.path.join(ETL_DIR, "4_predict_and_load_oracle.py"), ['step3']),
+    # The metrics report prints to stdout, so it waits for the dashboard steps
+    'metrics': Step(5, "Display Model Performance Metrics", METRICS_SCRIPT,
+                    ['step4', 'dashboard_pbit', 'dashboard_report'], True),
+    'dashboard_pbit': Step(6, "Create Power BI Dashboard Data Source",
+                           os.path.join(DASHBOARD_DIR, "create_powerbi_dashboard.py"), ['step4'], True),
+    'dashboard_report': Step(7, "Generate Power BI Report Template",
+                             os.path.join(DASHBOARD_DIR, "generate_pbi_report.py"), ['step4'], True),
+}
+
+# Modules already loaded in this process, keyed by file path
+_module_cache = {}
 
 def import_module_from_file(file_path):
-    """Import a module from file path."""
+    """Import a module from file path, loading each file only once per process."""
+    if file_path in _module_cache:
+        return _module_cache[file_path]
     module_name = os.path.basename(file_path).replace('.py', '')
     spec = importlib.util.spec_from_file_location(module_name, file_path)
     module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(module)
+    _module_cache[file_path] = module
     return module
 
-def run_step(step_num, step_name, script_path):
-    """Run a specific pipeline step."""
-    logger.info(f"Starting Step {step_num}: {step_name}")
+def run_step(step_key, script_path, isolate_tempdir=True):
+    """Run a pipeline step and return its duration.
+
+    Steps in worker processes get their own temporary directory so steps
+    running in parallel never clobber each other's temp files. Threaded
+    steps share the main process and leave its temp directory alone.
+    """
+    tmp_dir = None
+    if isolate_tempdir:
+        tmp_dir = tempfile.mkdtemp(prefix=f"{step_key}_")
+        tempfile.tempdir = tmp_dir
     start_time = time.time()
-    
     try:
-        # Import and run the module
         module = import_module_from_file(script_path)
         module.main()
-        
-        end_time = time.time()
-        duration = end_time - start_time
-        logger.info(f"Completed Step {step_num}: {step_name} in {duration:.2f} seconds")
-        return True
-    except Exception as e:
-        logger.error(f"Error in Step {step_num}: {step_name} - {str(e)}")
-        return False
-
-def show_metrics():
-    """Run the show_metrics.py script to display model performance metrics."""
-    logger.info("Displaying model performance metrics")
-    metrics_script = os.path.join(BASE_DIR, 'show_metrics.py')
+        return time.time() - start_time
+    finally:
+        if tmp_dir:
+            tempfile.tempdir = None
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def run_pipeline(steps):
+    """Run the given steps in dependency order, executing independent steps in parallel."""
+    # Only keep dependencies on steps that are part of this run
+    graph = {key: [dep for dep in step.deps if dep in steps] for key, step in steps.items()}
+    sorter = TopologicalSorter(graph)
+    sorter.prepare()
     
-    try:
-        subprocess.run([sys.executable, metrics_script], check=True)
-        logger.info("Metrics display completed")
-        return True
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Error displaying metrics: {str(e)}")
-        return False
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as process_executor, \
+            ThreadPoolExecutor(max_workers=MAX_IO_WORKERS) as thread_executor:
+        running = {}
+        while sorter.is_active():
+            for key in sorter.get_ready():
+                step = steps[key]
+                logger.info(f"Starting Step {step.num}: {step.name}")
+                if step.io_bound:
+                    future = thread_executor.submit(run_step, key, step.script_path, False)
+                else:
+                    future = process_executor.submit(run_step, key, step.script_path)
+                running[future] = key
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = running.pop(future)
+                step = steps[key]
+                try:
+                    duration = future.result()
+                except Exception as e:
+                    logger.error(f"Error in Step {step.num}: {step.name} - {str(e)}")
+                    logger.error(f"Pipeline failed at Step {step.num}: {step.name}")
+                    process_executor.shutdown(wait=True, cancel_futures=True)
+                    thread_executor.shutdown(wait=True, cancel_futures=True)
+                    return False
+                logger.info(f"Completed Step {step.num}: {step.name} in {duration:.2f} seconds")
+                sorter.done(key)
+    
+    return True
 
 def main():
     """Main function to orchestrate the ETL pipeline."""
     parser = argparse.ArgumentParser(description='Fraud Detection ETL Pipeline')
     parser.add_argument('--step', type=str, default='all', 
-                        help="Run a specific step (1-5) or 'all' for the entire pipeline")
+                        help="Run a specific step (1-7) or 'all' for the entire pipeline")
     parser.add_argument('--show-metrics', action='store_true',
                         help="Display model performance metrics after pipeline execution")
+    parser.add_argument('--accel', choices=['cpu', 'gpu'], default='cpu',
+                        help="Device used to train the model")
     args = parser.parse_args()
     
-    # Define pipeline steps
-    pipeline_steps = [
-        (1, "Load Bank Transactions to MySQL", os.path.join(ETL_DIR, "1_load_to_mysql.py")),
-        (2, "Transform Bank Features", os.path.join(ETL_DIR, "transform_bank_features.py")),
-        (3, "Train Fraud Detection Model", os.path.join(ETL_DIR, "3_train_model.py")),
-        (4, "Make Predictions and Load to Oracle", os.path.join(ETL_DIR, "4_predict_and_load_oracle.py"))
-    ]
+    # Passed to the training step through the environment of the worker processes
+    os.environ['MODEL_ACCEL'] = args.accel
+    
+    steps_by_num = {step.num: key for key, step in PIPELINE_STEPS.items()}
     
     # Determine which steps to run
-    steps_to_run = []
     if args.step == 'all':
-        steps_to_run = pipeline_steps
+        steps_to_run = dict(PIPELINE_STEPS)
     else:
         try:
             step_num = int(args.step)
-            if 1 <= step_num <= len(pipeline_steps):
-                steps_to_run = [pipeline_steps[step_num - 1]]
+            if step_num in steps_by_num:
+                key = steps_by_num[step_num]
+                steps_to_run = {key: PIPELINE_STEPS[key]}
             else:
-                logger.error(f"Invalid step number: {step_num}. Must be between 1 and {len(pipeline_steps)}")
+                logger.error(f"Invalid step number: {step_num}. Must be between 1 and {len(PIPELINE_STEPS)}")
                 return
         except ValueError:
             logger.error(f"Invalid step argument: {args.step}. Must be a number or 'all'")
             return
     
+    # Show metrics if requested
+    if args.show_metrics and 'metrics' not in steps_to_run:
+        # Report only after every selected step has finished successfully
+        steps_to_run['metrics'] = PIPELINE_STEPS['metrics']._replace(deps=list(steps_to_run))
+    
     # Run the selected steps
     logger.info(f"Starting Fraud Detection ETL Pipeline with {len(steps_to_run)} step(s)")
     pipeline_start_time = time.time()
     
-    success = True
-    for step_num, step_name, script_path in steps_to_run:
-        step_success = run_step(step_num, step_name, script_path)
-        if not step_success:
-            logger.error(f"Pipeline failed at Step {step_num}: {step_name}")
-            success = False
-            break
+    success = run_pipeline(steps_to_run)
     
     pipeline_end_time = time.time()
     pipeline_duration = pipeline_end_time - pipeline_start_time
     
     if success:
         logger.info(f"Fraud Detection ETL Pipeline completed successfully in {pipeline_duration:.2f} seconds")
-        
-        # Show metrics if requested or if we ran the full pipeline
-        if args.show_metrics or (args.step == 'all' or args.step == '5'):
-            show_metrics()
     else:
         logger.error(f"Fraud Detection ETL Pipeline failed after {pipeline_duration:.2f} seconds")
 
@@ -3,14 +3,17 @@
 """
 Power BI Dashboard Creator for Fraud Detection
 
-This script creates a Power BI template file (.pbit) for visualizing fraud detection metrics.
+This script writes a sample of the fraud detection data to Parquet together with a
+Power BI data source file (.pbids) that opens it in Power BI Desktop.
 """
 import os
-import json
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 import base64
 import zlib
-from datetime import datetime
 
 # Paths
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -20,105 +23,132 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # Input files
 PREDICTIONS_CSV = os.path.join(DATA_DIR, 'predicted.csv')
-PROCESSED_DATA_CSV = os.path.join(DATA_DIR, 'processed_bank_data.csv')
+PROCESSED_DATA_PARQUET = os.path.join(DATA_DIR, 'processed_bank_data.parquet')
+
+# Columns needed downstream from each input file, with their types
+PROCESSED_COLUMNS = {
+    'TransactionID': pa.string(),
+    'TransactionDate': pa.timestamp('us'),
+    'TransactionAmount': pa.float32(),
+    'TransactionType': pa.string(),
+    'AccountID': pa.string(),
+    'CustomerAge': pa.int32(),
+    'AccountBalance': pa.float32(),
+    'Location': pa.string(),
+    'Channel': pa.string()
+}
+PREDICTION_COLUMNS = {
+    'transaction_id': pa.string(),
+    'fraud_probability': pa.float32(),
+    'is_fraud': pa.int8()
+}
+
+# Block size for Arrow's multithreaded CSV reader
+CSV_BLOCK_SIZE = 8 << 20
 
 # Output files
-PBIX_TEMPLATE = os.path.join(OUTPUT_DIR, 'fraud_detection_template.pbit')
+SAMPLE_PARQUET = os.path.join(OUTPUT_DIR, 'fraud_sample.parquet')
+PBIDS_FILE = os.path.join(OUTPUT_DIR, 'fraud_detection.pbids')
+
+# Number of rows included in the dashboard sample
+SAMPLE_SIZE = 1000
+
+def read_csv_columns(path, column_types, max_rows=None):
+    """Read only the given columns of a CSV file with Arrow's multithreaded parser."""
+    table = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(use_threads=True, block_size=CSV_BLOCK_SIZE),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=list(column_types),
+            column_types=column_types
+        )
+    )
+    # Slice before converting so pandas only materializes the rows we keep
+    if max_rows is not None:
+        table = table.slice(0, max_rows)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+def read_parquet_columns(path, column_types, max_rows=None):
+    """Read only the given columns of a Parquet file, cast to the given types."""
+    table = pq.read_table(path, columns=list(column_types))
+    # Slice before converting so pandas only materializes the rows we keep
+    if max_rows is not None:
+        table = table.slice(0, max_rows)
+    return table.cast(pa.schema(column_types)).to_pandas(types_mapper=pd.ArrowDtype)
 
 # Create sample data for the dashboard
 def create_sample_data():
     """Create sample data for the Power BI template."""
     # Load predictions
-    predictions = pd.read_csv(PREDICTIONS_CSV)
+    predictions = read_csv_columns(PREDICTIONS_CSV, PREDICTION_COLUMNS)
     
-    # Load processed data
-    processed_data = pd.read_csv(PROCESSED_DATA_CSV)
+    # Load the processed transactions included in the sample
+    processed_data = read_parquet_columns(PROCESSED_DATA_PARQUET, PROCESSED_COLUMNS, max_rows=SAMPLE_SIZE)
+    
+    # Factorize both transaction ID columns against one shared dictionary so
+    # the merge hashes integer codes instead of strings
+    codes, _ = pd.factorize(pd.concat(
+        [processed_data['TransactionID'], predictions['transaction_id']], ignore_index=True
+    ))
+    processed_data['join_key'] = codes[:len(processed_data)]
+    predictions['join_key'] = codes[len(processed_data):]
     
     # Merge prediction results with processed data
-    if 'TransactionID' in processed_data.columns and 'transaction_id' in predictions.columns:
-        dashboard_data = pd.merge(
-            processed_data,
-            predictions[['transaction_id', 'fraud_probability', 'is_fraud']],
-            left_on='TransactionID',
-            right_on='transaction_id',
-            how='left'
-        )
-    else:
-        # Fallback if columns don't match
-        dashboard_data = processed_data.copy()
-        dashboard_data['fraud_probability'] = 0.0
-        dashboard_data['is_fraud'] = 0
+    dashboard_data = pd.merge(
+        processed_data,
+        predictions[['join_key', 'fraud_probability', 'is_fraud']],
+        on='join_key',
+        how='left'
+    ).drop(columns='join_key')
+    
+    # Transactions without a prediction are treated as not fraudulent
+    dashboard_data = dashboard_data.fillna({'fraud_probability': 0.0, 'is_fraud': 0})
+    dashboard_data['is_fraud'] = dashboard_data['is_fraud'].astype(int)
     
     return dashboard_data
 
-def create_powerbi_template(data):
-    """Create a Power BI template file with sample data."""
-    # Sample data for the template
-    sample_data = data.head(1000)  # Limit to 1000 rows for the template
-    
-    # Convert data to Power BI format
-    tables = {
-        'Transactions': {
-            'name': 'Transactions',
-            'columns': [
-                {'name': 'TransactionID', 'dataType': 'string'},
-                {'name': 'TransactionDate', 'dataType': 'dateTime'},
-                {'name': 'TransactionAmount', 'dataType': 'number'},
-                {'name': 'TransactionType', 'dataType': 'string'},
-                {'name': 'AccountID', 'dataType': 'string'},
-                {'name': 'CustomerAge', 'dataType': 'number'},
-                {'name': 'AccountBalance', 'dataType': 'number'},
-                {'name': 'fraud_probability', 'dataType': 'number'},
-                {'name': 'is_fraud', 'dataType': 'number'},
-                {'name': 'Location', 'dataType': 'string'},
-                {'name': 'Channel', 'dataType': 'string'},
-            ],
-            'rows': sample_data[[
-                'TransactionID', 'TransactionDate', 'TransactionAmount',
-                'TransactionType', 'AccountID', 'CustomerAge', 'AccountBalance',
-                'fraud_probability', 'is_fraud', 'Location', 'Channel'
-            ]].to_dict('records')
-        }
-    }
-    
-    # Create the Power BI template structure
-    template = {
-        'name': 'Fraud Detection Dashboard',
-        'version': '1.0',
-        'created': datetime.now().isoformat(),
-        'tables': tables
+def save_sample_data(data, output_file):
+    """Save the dashboard sample as a Parquet file."""
+    data.to_parquet(output_file, engine='pyarrow', compression='zstd', index=False)
+    print(f"Sample data saved to {output_file}")
+
+def create_powerbi_template(data_file):
+    """Create a Power BI data source descriptor pointing at the Parquet sample."""
+    return {
+        'version': '0.1',
+        'connections': [
+            {
+                'details': {
+                    'protocol': 'file',
+                    'address': {'path': os.path.abspath(data_file)}
+                },
+                'options': {},
+                'mode': None
+            }
+        ]
     }
-    
-    return template
 
-def save_as_pbit(template, output_file):
-    """Save the template as a .pbit file."""
-    # In a real implementation, this would create an actual .pbit file
-    # For now, we'll save a JSON representation
-    with open(output_file.replace('.pbit', '.json'), 'w') as f:
-        json.dump(template, f, indent=2)
+def save_as_pbids(template, output_file):
+    """Save the data source descriptor as a .pbids file."""
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(template, option=orjson.OPT_INDENT_2))
     
-    print(f"Template saved to {output_file.replace('.pbit', '.json')}")
-    print("Note: This is a JSON representation. To create a real .pbit file, "
-          "you would need to use Power BI Desktop or the Power BI REST API.")
+    print(f"Power BI data source saved to {output_file}")
 
 def main():
     print("Creating Power BI dashboard template...")
     
     # Create and save sample data
     data = create_sample_data()
+    save_sample_data(data, SAMPLE_PARQUET)
     
-    # Create Power BI template
-    template = create_powerbi_template(data)
-    
-    # Save as .pbit (JSON representation for now)
-    save_as_pbit(template, PBIX_TEMPLATE)
+    # Create the Power BI data source pointing at the sample
+    template = create_powerbi_template(SAMPLE_PARQUET)
+    save_as_pbids(template, PBIDS_FILE)
     
     print("\nTo complete the setup:")
-    print("1. Open Power BI Desktop")
-    print("2. Connect to the data source:")
-    print(f"   - CSV file: {PREDICTIONS_CSV}")
-    print(f"   - Processed data: {PROCESSED_DATA_CSV}")
+    print(f"1. Open {PBIDS_FILE} in Power BI Desktop")
+    print("2. Load the fraud_sample table")
     print("3. Create visualizations for:")
     print("   - Fraud distribution by amount")
     print("   - Fraud probability over time")
@@ -1,31 +1,21 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import os
 import pandas as pd
-import mysql.connector
-from dotenv import load_dotenv
 import logging
+from _db import get_mysql_connection
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def load_environment_variables():
-    """Load database credentials from .env file."""
-    load_dotenv()
-    return {
-        'host': os.getenv('MYSQL_HOST'),
-        'user': os.getenv('MYSQL_USER'),
-        'password': os.getenv('MYSQL_PASSWORD'),
-        'database': os.getenv('MYSQL_DATABASE')
-    }
+# Rows per multi-row INSERT statement
+BATCH_SIZE = 10000
 
 def create_mysql_connection():
     """Create MySQL database connection."""
     try:
-        db_config = load_environment_variables()
-        connection = mysql.connector.connect(**db_config)
+        connection = get_mysql_connection()
         logger.info("Successfully connected to MySQL database")
         return connection
     except Exception as e:
@@ -64,18 +54,29 @@ def load_sample_data(cursor):
         ('TXN003', '2024-03-15 12:15:00', 75.50, 'MERCH001', 'CUST003', 'PURCHASE', 'Chicago', 'DEV003', '192.168.1.3', False)
     ]
     
-    insert_query = """
-    INSERT INTO transactions 
-    (transaction_id, timestamp, amount, merchant_id, customer_id, transaction_type, location, device_id, ip_address, is_fraud)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """
+    columns = ("transaction_id, timestamp, amount, merchant_id, customer_id, "
+               "transaction_type, location, device_id, ip_address, is_fraud")
+    row_placeholder = "(" + ", ".join(["%s"] * 10) + ")"
     
     try:
-        cursor.executemany(insert_query, sample_data)
+        # Skip per-row constraint checks for the duration of the bulk load
+        cursor.execute("SET unique_checks=0")
+        cursor.execute("SET foreign_key_checks=0")
+        
+        # One multi-row INSERT per batch instead of one round trip per row
+        for i in range(0, len(sample_data), BATCH_SIZE):
+            batch = sample_data[i:i + BATCH_SIZE]
+            insert_query = (f"INSERT INTO transactions ({columns}) VALUES "
+                            + ", ".join([row_placeholder] * len(batch)))
+            cursor.execute(insert_query, [value for row in batch for value in row])
+        
         logger.info(f"Successfully loaded {len(sample_data)} sample transactions")
     except Exception as e:
         logger.error(f"Error loading sample data: {str(e)}")
         raise
+    finally:
+        cursor.execute("SET unique_checks=1")
+        cursor.execute("SET foreign_key_checks=1")
 
 def main():
     """Main function to load data into MySQL."""
@@ -2,15 +2,13 @@
 # -*- coding: utf-8 -*-
 
 import os
-import pandas as pd
 import numpy as np
-import joblib
-import cx_Oracle
-import mysql.connector
-from dotenv import load_dotenv
+import onnxruntime as ort
+from numba import njit, prange
+import oracledb
 import logging
-import uuid
-from datetime import datetime
+from _db import get_oracle_pool
+from _transformed import get_transformed_data
 
 # Setup logging
 logging.basicConfig(
@@ -20,50 +18,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def load_environment_variables():
-    """Load database credentials from .env file."""
-    load_dotenv()
-    return {
-        'mysql': {
-            'host': os.getenv('MYSQL_HOST', 'localhost'),
-            'user': os.getenv('MYSQL_USER', 'root'),
-            'password': os.getenv('MYSQL_PASSWORD', '920400'),
-            'database': os.getenv('MYSQL_DATABASE', 'bank_transactions'),
-            'port': int(os.getenv('MYSQL_PORT', 3306))
-        },
-        'oracle': {
-            'user': os.getenv('ORACLE_USER', 'bank_admin'),
-            'password': os.getenv('ORACLE_PASSWORD', '920400'),
-            'dsn': os.getenv('ORACLE_DSN', 'localhost:1521/XEPDB1')
-        }
-    }
-
-def get_transformed_data():
-    """Fetch transformed transaction data from MySQL."""
-    try:
-        db_config = load_environment_variables()['mysql']
-        connection = mysql.connector.connect(**db_config)
-        cursor = connection.cursor(dictionary=True)
-        
-        query = "SELECT * FROM transformed_transactions"
-        cursor.execute(query)
-        data = cursor.fetchall()
-        
-        cursor.close()
-        connection.close()
-        
-        return pd.DataFrame(data)
-    except Exception as e:
-        logger.error(f"Error fetching transformed data: {str(e)}")
-        raise
+# Directories
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+
+# Prediction results read by the metrics and dashboard steps
+PREDICTIONS_PATH = os.path.join(DATA_DIR, 'predicted.csv')
+
+# Rows sent per array DML round trip to Oracle
+ORACLE_BATCH_SIZE = 10000
+
+# Number of failed rows logged individually when an Oracle batch load fails
+MAX_LOGGED_BATCH_ERRORS = 5
+
+# Rows scored per predict_proba call and the fraud decision threshold
+PREDICT_CHUNK_SIZE = 65536
+FRAUD_THRESHOLD = 0.5
+
+# Probability at or above which a transaction is bucketed as high risk
+HIGH_RISK_THRESHOLD = 0.8
 
 def load_model():
     """Load the trained fraud detection model."""
     try:
         models_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models')
-        model_path = os.path.join(models_dir, 'fraud_detection_model.joblib')
+        model_path = os.path.join(models_dir, 'fraud_detection_model.onnx')
         
-        model = joblib.load(model_path)
+        # The ONNX export of the trained model runs as a compiled tree ensemble
+        model = ort.InferenceSession(model_path, providers=['CPUExecutionProvider'])
         logger.info("Model loaded successfully")
         
         return model
@@ -71,6 +53,23 @@ def load_model():
         logger.error(f"Error loading model: {str(e)}")
         raise
 
+@njit(parallel=True, cache=True)
+def label_and_bucket(probabilities):
+    """Derive fraud labels and risk buckets (0=low, 1=medium, 2=high) from probabilities."""
+    n = probabilities.shape[0]
+    labels = np.empty(n, dtype=np.int8)
+    buckets = np.empty(n, dtype=np.int8)
+    for i in prange(n):
+        p = probabilities[i]
+        labels[i] = 1 if p >= FRAUD_THRESHOLD else 0
+        if p >= HIGH_RISK_THRESHOLD:
+            buckets[i] = 2
+        elif p >= FRAUD_THRESHOLD:
+            buckets[i] = 1
+        else:
+            buckets[i] = 0
+    return labels, buckets
+
 def make_predictions(model, df):
     """Make fraud predictions using the loaded model."""
     try:
@@ -78,13 +77,19 @@ def make_predictions(model, df):
         features = ['amount', 'amount_log', 'hour', 'day_of_week', 'is_weekend',
                    'location_encoded', 'device_encoded', 'merchant_encoded']
         
-        # Make predictions
-        predictions = model.predict(df[features])
-        probabilities = model.predict_proba(df[features])[:, 1]
+        # Score in fixed-size chunks, then derive labels and risk buckets
+        # from the probabilities. The session outputs [labels, probabilities].
+        X = df[features].to_numpy(dtype=np.float32)
+        probabilities = np.empty(len(X), dtype=np.float32)
+        for start in range(0, len(X), PREDICT_CHUNK_SIZE):
+            end = start + PREDICT_CHUNK_SIZE
+            probabilities[start:end] = model.run(None, {'X': X[start:end]})[1][:, 1]
+        predictions, risk_buckets = label_and_bucket(probabilities)
         
         # Add predictions to DataFrame
         df['predicted_fraud'] = predictions
         df['fraud_probability'] = probabilities
+        df['risk_bucket'] = risk_buckets
         
         logger.info(f"Made predictions for {len(df)} transactions")
         return df
@@ -92,19 +97,41 @@ def make_predictions(model, df):
         logger.error(f"Error making predictions: {str(e)}")
         raise
 
+def save_predictions(df):
+    """Save predictions to CSV for the metrics and dashboard steps."""
+    try:
+        predictions = df[['transaction_id', 'amount', 'merchant_id', 'customer_id', 'is_fraud',
+                          'predicted_fraud', 'fraud_probability', 'risk_bucket']]
+        predictions = predictions.assign(prediction_threshold=FRAUD_THRESHOLD)
+        predictions.to_csv(PREDICTIONS_PATH, index=False)
+        logger.info(f"Predictions saved to {PREDICTIONS_PATH}")
+    except Exception as e:
+        logger.error(f"Error saving predictions: {str(e)}")
+        raise
+
 def create_oracle_table(cursor):
     """Create predictions table in Oracle if it doesn't exist."""
     try:
+        # Oracle has no CREATE TABLE IF NOT EXISTS; ignore ORA-00955
+        # (name already used) so reruns keep the existing table
         create_table_query = """
-        CREATE TABLE IF NOT EXISTS fraud_predictions (
-            transaction_id VARCHAR2(50) PRIMARY KEY,
-            amount NUMBER(10,2),
-            merchant_id VARCHAR2(50),
-            customer_id VARCHAR2(50),
-            predicted_fraud NUMBER(1),
-            fraud_probability NUMBER(5,4),
-            prediction_timestamp TIMESTAMP DEFAULT SYSTIMESTAMP
-        )
+        BEGIN
+            EXECUTE IMMEDIATE '
+                CREATE TABLE fraud_predictions (
+                    transaction_id VARCHAR2(50) PRIMARY KEY,
+                    amount NUMBER(10,2),
+                    merchant_id VARCHAR2(50),
+                    customer_id VARCHAR2(50),
+                    predicted_fraud NUMBER(1),
+                    fraud_probability NUMBER(5,4),
+                    prediction_timestamp TIMESTAMP DEFAULT SYSTIMESTAMP
+                )';
+        EXCEPTION
+            WHEN OTHERS THEN
+                IF SQLCODE != -955 THEN
+                    RAISE;
+                END IF;
+        END;
         """
         cursor.execute(create_table_query)
         logger.info("Oracle predictions table created or already exists")
@@ -114,10 +141,12 @@ def create_oracle_table(cursor):
 
 def load_predictions_to_oracle(df):
     """Load predictions to Oracle database."""
+    # Take a session from the shared Oracle pool
+    pool = get_oracle_pool()
+    connection = None
     try:
-        # Connect to Oracle
-        db_config = load_environment_variables()['oracle']
-        connection = cx_Oracle.connect(**db_config)
+        connection = pool.acquire()
+        connection.autocommit = False
         cursor = connection.cursor()
         
         # Create table if it doesn't exist
@@ -130,21 +159,47 @@ def load_predictions_to_oracle(df):
         VALUES (:1, :2, :3, :4, :5, :6)
         """
         
-        # Convert DataFrame to list of tuples
-        records = df[['transaction_id', 'amount', 'merchant_id', 'customer_id', 
-                     'predicted_fraud', 'fraud_probability']].values.tolist()
-        
-        # Insert data
-        cursor.executemany(insert_query, records)
+        # Declare bind types up front so they aren't re-inferred for every row
+        cursor.bindarraysize = ORACLE_BATCH_SIZE
+        cursor.setinputsizes(50, oracledb.DB_TYPE_NUMBER, 50, 50,
+                             oracledb.DB_TYPE_NUMBER, oracledb.DB_TYPE_NUMBER)
+        
+        # Convert whole columns to Python values at once instead of row by row
+        columns = [
+            df['transaction_id'].to_numpy().tolist(),
+            df['amount'].to_numpy(dtype=np.float64).tolist(),
+            df['merchant_id'].to_numpy().tolist(),
+            df['customer_id'].to_numpy().tolist(),
+            df['predicted_fraud'].to_numpy(dtype=np.int64).tolist(),
+            df['fraud_probability'].to_numpy(dtype=np.float64).tolist()
+        ]
+        record_count = len(df)
+        
+        # Insert data in large array DML batches and commit once at the end
+        batch_errors = []
+        for start in range(0, record_count, ORACLE_BATCH_SIZE):
+            end = start + ORACLE_BATCH_SIZE
+            batch = list(zip(*(column[start:end] for column in columns)))
+            cursor.executemany(insert_query, batch, batcherrors=True)
+            batch_errors.extend((start + error.offset, error.message) for error in cursor.getbatcherrors())
+        
+        # Any failed row (e.g. ORA-00001 on a rerun) fails the whole load
+        if batch_errors:
+            for offset, message in batch_errors[:MAX_LOGGED_BATCH_ERRORS]:
+                logger.error(f"Error inserting row {offset}: {message}")
+            connection.rollback()
+            raise RuntimeError(f"{len(batch_errors)} of {record_count} predictions failed to insert; "
+                               f"the load was rolled back")
         connection.commit()
-        
         cursor.close()
-        connection.close()
         
-        logger.info(f"Successfully loaded {len(records)} predictions to Oracle")
+        logger.info(f"Successfully loaded {record_count} predictions to Oracle")
     except Exception as e:
         logger.error(f"Error loading predictions to Oracle: {str(e)}")
         raise
+    finally:
+        if connection is not None:
+            pool.release(connection)
 
 def main():
     """Main function to make predictions and load to Oracle."""
@@ -158,6 +213,7 @@ def main():
         
         # Make predictions
         df_with_predictions = make_predictions(model, df)
+        save_predictions(df_with_predictions)
         
         # Load predictions to Oracle
         load_predictions_to_oracle(df_with_predictions)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Shared database helpers for the ETL scripts.
+
+Database settings are read from the .env file once, when this module is first
+imported, and connections are handed out from pools so each step doesn't pay
+for a new connection handshake every time it talks to MySQL or Oracle.
+"""
+
+import os
+import oracledb
+from types import MappingProxyType
+from urllib.parse import quote
+from mysql.connector.pooling import MySQLConnectionPool
+from dotenv import load_dotenv
+
+# Connection pools, created on first use
+_mysql_pool = None
+_oracle_pool = None
+
+# Load environment variables
+load_dotenv()
+
+# Database configuration, read-only since every step shares the same settings
+MYSQL_CONFIG = MappingProxyType({
+    'host': os.getenv('MYSQL_HOST', 'localhost'),
+    'user': os.getenv('MYSQL_USER', 'root'),
+    'password': os.getenv('MYSQL_PASSWORD', '920400'),
+    'database': os.getenv('MYSQL_DATABASE', 'bank_transactions'),
+    'port': int(os.getenv('MYSQL_PORT', 3306))
+})
+ORACLE_CONFIG = MappingProxyType({
+    'user': os.getenv('ORACLE_USER', 'bank_admin'),
+    'password': os.getenv('ORACLE_PASSWORD', '920400'),
+    'dsn': os.getenv('ORACLE_DSN', 'localhost:1521/XEPDB1')
+})
+
+def get_mysql_url():
+    """Build the connectorx URL for the MySQL database."""
+    user = quote(MYSQL_CONFIG['user'], safe='')
+    password = quote(MYSQL_CONFIG['password'], safe='')
+    return (f"mysql://{user}:{password}"
+            f"@{MYSQL_CONFIG['host']}:{MYSQL_CONFIG['port']}/{MYSQL_CONFIG['database']}")
+
+def get_mysql_connection():
+    """Get a connection from the MySQL pool; close() returns it to the pool."""
+    global _mysql_pool
+    if _mysql_pool is None:
+        _mysql_pool = MySQLConnectionPool(
+            pool_name='etl',
+            # The pool opens every connection up front, and each process only
+            # checks out one, so a larger pool would just add handshakes
+            pool_size=1,
+            # Connections are only handed back to this process' own steps,
+            # so skip the session reset round trip on every checkout
+            pool_reset_session=False,
+            use_pure=False,
+            autocommit=False,
+            **MYSQL_CONFIG
+        )
+    return _mysql_pool.get_connection()
+
+def get_oracle_pool():
+    """Get the shared Oracle session pool."""
+    global _oracle_pool
+    if _oracle_pool is None:
+        # python-oracledb runs in thin mode unless init_oracle_client() is
+        # called, so no Oracle client libraries are needed
+        _oracle_pool = oracledb.create_pool(
+            min=1,
+            max=4,
+            increment=1,
+            homogeneous=True,
+            **ORACLE_CONFIG
+        )
+    return _oracle_pool
@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Shared feature derivation for the model training and prediction steps.
+
+The derived columns are computed once with vectorized NumPy operations when
+the transformed data is cached, so steps 3 and 4 read them as-is.
+"""
+
+import numpy as np
+
+def compute_features(df):
+    """Derive amount and time features from the amount and timestamp columns."""
+    amount = df['amount'].to_numpy(dtype=np.float32)
+    df['amount_log'] = np.log1p(amount)
+    
+    # Work on the raw datetime64 values instead of the .dt accessors
+    timestamps = df['timestamp'].to_numpy(dtype='datetime64[ns]')
+    hours = timestamps.astype('datetime64[h]').astype(np.int64)
+    days = timestamps.astype('datetime64[D]').astype(np.int64)
+    
+    df['hour'] = (hours % 24).astype(np.int8)
+    # 1970-01-01 was a Thursday, so shift by 3 to get Monday=0 ... Sunday=6
+    df['day_of_week'] = ((days + 3) % 7).astype(np.int8)
+    df['is_weekend'] = (df['day_of_week'] >= 5).astype(np.int8)
+    
+    return df
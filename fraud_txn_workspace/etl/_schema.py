@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Shared column types for reading the bank transactions CSV.
+
+Steps 1 and 2 both read the raw CSV, so they use the same types and pandas
+skips type inference in both.
+"""
+
+# Column types and date columns for the CSV readers; amounts stay float64 to
+# load exactly into the DECIMAL columns, and the numeric columns used in
+# feature arithmetic match the float64 values read back from MySQL
+CSV_DTYPES = {
+    'TransactionID': 'string',
+    'AccountID': 'category',
+    'TransactionAmount': 'float64',
+    'TransactionType': 'category',
+    'Location': 'category',
+    'DeviceID': 'category',
+    'IP Address': 'string',
+    'MerchantID': 'category',
+    'Channel': 'category',
+    'CustomerAge': 'int16',
+    'CustomerOccupation': 'category',
+    'TransactionDuration': 'float64',
+    'LoginAttempts': 'int8',
+    'AccountBalance': 'float64'
+}
+CSV_DATE_COLUMNS = ['TransactionDate', 'PreviousTransactionDate']
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Shared access to the transformed transaction data for steps 3 and 4.
+
+transformed_transactions is read from MySQL once, its model features are
+derived, and the result is cached as Parquet; later reads use the cache
+until the table changes again.
+"""
+
+import os
+import logging
+import pandas as pd
+import connectorx as cx
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL
+from _db import MYSQL_CONFIG, get_mysql_url
+from _features import compute_features
+
+logger = logging.getLogger(__name__)
+
+# Directories
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+
+# Parquet copy of transformed_transactions shared by steps 3 and 4
+TRANSFORMED_CACHE_PATH = os.path.join(DATA_DIR, 'transformed.parquet')
+
+# SQLAlchemy engine, created on first use and shared by all queries
+_engine = None
+
+def get_engine():
+    """Return the shared SQLAlchemy engine for the MySQL database."""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(URL.create(
+            'mysql+mysqlconnector',
+            username=MYSQL_CONFIG['user'],
+            password=MYSQL_CONFIG['password'],
+            host=MYSQL_CONFIG['host'],
+            port=MYSQL_CONFIG['port'],
+            database=MYSQL_CONFIG['database']
+        ))
+    return _engine
+
+def is_transformed_cache_fresh():
+    """Check whether the Parquet cache is newer than the last change to transformed_transactions."""
+    if not os.path.exists(TRANSFORMED_CACHE_PATH):
+        return False
+    
+    # Compare epoch seconds on both sides; UPDATE_TIME itself is in the
+    # server session's time zone, not the client's
+    query = text(
+        "SELECT UNIX_TIMESTAMP(UPDATE_TIME) FROM information_schema.TABLES "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'transformed_transactions'"
+    )
+    with get_engine().connect() as connection:
+        # MySQL 8 caches table statistics such as UPDATE_TIME for up to a day
+        # by default; read the current value instead
+        connection.execute(text("SET SESSION information_schema_stats_expiry = 0"))
+        last_update = connection.execute(query).scalar()
+    
+    # Without a known update time the cache can't be trusted
+    if last_update is None:
+        return False
+    return os.path.getmtime(TRANSFORMED_CACHE_PATH) >= float(last_update)
+
+def get_transformed_data():
+    """Fetch transformed transaction data, from the Parquet cache when it is fresh."""
+    try:
+        if is_transformed_cache_fresh():
+            logger.info(f"Reading transformed data from cache {TRANSFORMED_CACHE_PATH}")
+            return pd.read_parquet(TRANSFORMED_CACHE_PATH, engine='pyarrow', memory_map=True)
+        
+        query = "SELECT * FROM transformed_transactions"
+        
+        # connectorx fills the DataFrame columns directly; mysql-connector has
+        # no server-side cursors, so reading through it would buffer every row
+        # as a Python tuple first
+        df = cx.read_sql(get_mysql_url(), query, return_type='pandas')
+        
+        # Derive the model features once so every cache reader gets them as-is
+        df = compute_features(df)
+        
+        # Write to a temporary file first so a reader never sees a partial cache
+        os.makedirs(DATA_DIR, exist_ok=True)
+        tmp_path = TRANSFORMED_CACHE_PATH + '.tmp'
+        df.to_parquet(tmp_path, engine='pyarrow', compression='snappy', index=False)
+        os.replace(tmp_path, TRANSFORMED_CACHE_PATH)
+        logger.info(f"Cached transformed data to {TRANSFORMED_CACHE_PATH}")
+        
+        return df
+    except Exception as e:
+        logger.error(f"Error fetching transformed data: {str(e)}")
+        raise
@@ -1,10 +1,12 @@
 import os
+import tempfile
 import pandas as pd
 import mysql.connector
 from mysql.connector import Error
-from dotenv import load_dotenv
 import logging
 from tqdm import tqdm
+from _db import MYSQL_CONFIG
+from _schema import CSV_DTYPES, CSV_DATE_COLUMNS
 
 # Setup logging
 logging.basicConfig(
@@ -14,21 +16,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
-
-# Configuration
-MYSQL_HOST = os.getenv('MYSQL_HOST', 'localhost')
-MYSQL_USER = os.getenv('MYSQL_USER', 'root')
-MYSQL_PASSWORD = os.getenv('MYSQL_PASSWORD', '920400')
-MYSQL_DATABASE = os.getenv('MYSQL_DATABASE', 'bank_transactions')
-MYSQL_PORT = int(os.getenv('MYSQL_PORT', 3306))
+# Configuration (loaded once from the .env file by _db)
+MYSQL_HOST = MYSQL_CONFIG['host']
+MYSQL_USER = MYSQL_CONFIG['user']
+MYSQL_PASSWORD = MYSQL_CONFIG['password']
+MYSQL_DATABASE = MYSQL_CONFIG['database']
+MYSQL_PORT = MYSQL_CONFIG['port']
 
 # Set paths
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 BANK_DATA_PATH = os.path.join(DATA_DIR, 'bank_transactions_data_2.csv')
 
+# Rows read from the CSV and loaded to MySQL at a time
+CSV_CHUNK_SIZE = 50_000
+
+# Columns of the Transactions table, in insert order
+TABLE_COLUMNS = [
+    'TransactionID', 'AccountID', 'TransactionAmount', 'TransactionDate', 'TransactionType',
+    'Location', 'DeviceID', 'IP_Address', 'MerchantID', 'Channel', 'CustomerAge',
+    'CustomerOccupation', 'TransactionDuration', 'LoginAttempts', 'AccountBalance',
+    'PreviousTransactionDate'
+]
+
 def create_mysql_connection():
     """Create a connection to the MySQL database."""
     try:
@@ -36,7 +46,10 @@ def create_mysql_connection():
             host=MYSQL_HOST,
             user=MYSQL_USER,
             password=MYSQL_PASSWORD,
-            port=MYSQL_PORT
+            port=MYSQL_PORT,
+            autocommit=False,
+            allow_local_infile=True,
+            use_pure=False
         )
         if connection.is_connected():
             logger.info("Connected to MySQL database")
@@ -85,60 +98,96 @@ def create_database_and_table(connection):
     finally:
         cursor.close()
 
+def load_data_with_infile(connection, df):
+    """Bulk load data from DataFrame with LOAD DATA LOCAL INFILE.
+    
+    Returns True on success, False if the server refused the load so the
+    caller can fall back to batched inserts.
+    """
+    cursor = connection.cursor()
+    cursor.execute(f"USE {MYSQL_DATABASE}")
+    
+    # Write the rows in table column order to a temporary CSV for the server to stream
+    tmp_file = tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False)
+    try:
+        df = df.rename(columns={'IP Address': 'IP_Address'})  # Note the space in the CSV column name
+        df[TABLE_COLUMNS].to_csv(tmp_file, index=False, lineterminator='\n')
+        tmp_file.close()
+        
+        infile_path = tmp_file.name.replace('\\', '/')
+        cursor.execute(f"""
+        LOAD DATA LOCAL INFILE '{infile_path}'
+        REPLACE INTO TABLE Transactions
+        FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+        LINES TERMINATED BY '\\n'
+        IGNORE 1 LINES
+        (TransactionID, AccountID, TransactionAmount, @TransactionDate, TransactionType,
+         Location, DeviceID, IP_Address, MerchantID, Channel, CustomerAge,
+         CustomerOccupation, TransactionDuration, LoginAttempts, AccountBalance,
+         @PreviousTransactionDate)
+        SET TransactionDate = STR_TO_DATE(@TransactionDate, '%Y-%m-%d %H:%i:%s'),
+            PreviousTransactionDate = STR_TO_DATE(@PreviousTransactionDate, '%Y-%m-%d %H:%i:%s')
+        """)
+        connection.commit()
+        
+        logger.info("Successfully loaded %d records to MySQL with LOAD DATA LOCAL INFILE", len(df))
+        return True
+    except Error as e:
+        logger.warning("LOAD DATA LOCAL INFILE failed, falling back to batched inserts: %s", str(e))
+        connection.rollback()
+        return False
+    finally:
+        cursor.close()
+        tmp_file.close()
+        os.remove(tmp_file.name)
+
 def load_data_to_mysql(connection, df):
     """Load data from DataFrame to MySQL database."""
     # Switch to the database
     cursor = connection.cursor()
     cursor.execute(f"USE {MYSQL_DATABASE}")
     
-    # Prepare the REPLACE statement (will update existing records with same primary key)
-    insert_query = """
-    REPLACE INTO Transactions 
-    (TransactionID, AccountID, TransactionAmount, TransactionDate, TransactionType, 
-     Location, DeviceID, IP_Address, MerchantID, Channel, CustomerAge, 
-     CustomerOccupation, TransactionDuration, LoginAttempts, AccountBalance, 
-     PreviousTransactionDate)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """
+    # Parts of the REPLACE statement (will update existing records with same primary key)
+    columns = ", ".join(TABLE_COLUMNS)
+    row_placeholder = "(" + ", ".join(["%s"] * len(TABLE_COLUMNS)) + ")"
     
-    # Convert DataFrame rows to list of tuples for batch insert
-    records = []
-    for _, row in df.iterrows():
-        record = (
-            row['TransactionID'],
-            row['AccountID'],
-            float(row['TransactionAmount']),
-            row['TransactionDate'],
-            row['TransactionType'],
-            row['Location'],
-            row['DeviceID'],
-            row['IP Address'],  # Note the space in column name
-            row['MerchantID'],
-            row['Channel'],
-            int(row['CustomerAge']),
-            row['CustomerOccupation'],
-            float(row['TransactionDuration']),
-            int(row['LoginAttempts']),
-            float(row['AccountBalance']),
-            row['PreviousTransactionDate']
-        )
-        records.append(record)
+    # Convert whole columns to the insert types at once, then build the
+    # record tuples in table column order without a per-row Python loop
+    df = df.rename(columns={'IP Address': 'IP_Address'})  # Note the space in the CSV column name
+    df = df.astype({
+        'TransactionAmount': 'float64',
+        'CustomerAge': 'int32',
+        'TransactionDuration': 'float64',
+        'LoginAttempts': 'int32',
+        'AccountBalance': 'float64'
+    })
+    records = list(df[TABLE_COLUMNS].itertuples(index=False, name=None))
     
-    # Insert data in batches
-    batch_size = 100
+    # Insert data in large batches and commit once at the end
+    batch_size = 10000
     total_batches = (len(records) + batch_size - 1) // batch_size
     
     try:
+        # Skip secondary constraint checks for the duration of the bulk load
+        cursor.execute("SET unique_checks=0")
+        cursor.execute("SET foreign_key_checks=0")
+        
         for i in tqdm(range(0, len(records), batch_size), total=total_batches, desc="Loading data to MySQL"):
             batch = records[i:i + batch_size]
-            cursor.executemany(insert_query, batch)
-            connection.commit()
+            # One multi-row REPLACE per batch; the connector only rewrites
+            # INSERT statements for executemany, so REPLACE went row by row
+            insert_query = (f"REPLACE INTO Transactions ({columns}) VALUES "
+                            + ", ".join([row_placeholder] * len(batch)))
+            cursor.execute(insert_query, [value for row in batch for value in row])
+        connection.commit()
         
         logger.info("Successfully loaded %d records to MySQL", len(records))
     except Error as e:
         logger.error("Error inserting data to MySQL: %s", str(e))
         connection.rollback()
     finally:
+        cursor.execute("SET unique_checks=1")
+        cursor.execute("SET foreign_key_checks=1")
         cursor.close()
 
 def main():
@@ -153,15 +202,6 @@ def main():
         logger.error("Bank transaction dataset not found at: %s", BANK_DATA_PATH)
         return
     
-    # Load the dataset
-    logger.info("Loading dataset from: %s", BANK_DATA_PATH)
-    try:
-        df = pd.read_csv(BANK_DATA_PATH)
-        logger.info("Dataset loaded successfully with %d rows", len(df))
-    except Exception as e:
-        logger.error("Error loading dataset: %s", str(e))
-        return
-    
     # Connect to MySQL
     connection = create_mysql_connection()
     if not connection:
@@ -170,11 +210,26 @@ def main():
     # Create database and table if they don't exist
     create_database_and_table(connection)
     
-    # Load data to MySQL
-    load_data_to_mysql(connection, df)
+    # Stream the dataset in chunks, loading each chunk before reading the next
+    logger.info("Loading dataset from: %s", BANK_DATA_PATH)
+    use_infile = True
+    total_rows = 0
+    try:
+        for chunk in pd.read_csv(BANK_DATA_PATH, chunksize=CSV_CHUNK_SIZE, engine='c',
+                                 dtype=CSV_DTYPES, parse_dates=CSV_DATE_COLUMNS):
+            # Use LOAD DATA while the server allows it, batched inserts otherwise
+            if use_infile:
+                use_infile = load_data_with_infile(connection, chunk)
+            if not use_infile:
+                load_data_to_mysql(connection, chunk)
+            total_rows += len(chunk)
+        logger.info("Dataset loaded successfully with %d rows", total_rows)
+    except Exception as e:
+        logger.error("Error loading dataset: %s", str(e))
+    finally:
+        # Close connection
+        connection.close()
     
-    # Close connection
-    connection.close()
     logger.info("Data loading process completed")
 
 if __name__ == "__main__":